@@ -1,26 +1,63 @@
 # app.py
 import os
+import importlib.util
 import time
+import asyncio
 import re
 import math
 import json
 import random
 import hashlib
-from datetime import datetime, timedelta
-from urllib.parse import quote_plus
+import functools
+import itertools
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from html import escape
+from urllib.parse import quote_plus, urlsplit
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Optional
 
 import streamlit as st
 import requests
-import feedparser
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+import lxml.html
+from lxml.cssselect import CSSSelector
+from lxml.etree import XPath
 
-# Optional: better extraction where allowed
+# Optional: faster JSON decoding of model output
 try:
-    from newspaper import Article
-    NEWSPAPER_OK = True
+    import orjson
+    json_loads = orjson.loads
 except Exception:
-    NEWSPAPER_OK = False
+    json_loads = json.loads
+
+# Optional: asyncio fan-out for article downloads
+try:
+    import aiohttp
+except Exception:
+    aiohttp = None
+
+# Optional: persistent cache so fetched feeds/articles survive restarts
+try:
+    import diskcache
+except Exception:
+    diskcache = None
+
+# Optional: better extraction where allowed. newspaper takes seconds to import, so only
+# check it is installed here and import it on the first extraction (see _newspaper_article)
+NEWSPAPER_OK = importlib.util.find_spec("newspaper") is not None
+_NEWSPAPER_ARTICLE = None
+
+def _newspaper_article():
+    """Return newspaper.Article, importing it on first use; None if the import fails"""
+    global _NEWSPAPER_ARTICLE, NEWSPAPER_OK
+    if _NEWSPAPER_ARTICLE is None and NEWSPAPER_OK:
+        try:
+            from newspaper import Article
+            _NEWSPAPER_ARTICLE = Article
+        except Exception:
+            NEWSPAPER_OK = False
+    return _NEWSPAPER_ARTICLE
 
 # -------------
 # Subscription and token management
@@ -237,6 +274,17 @@ EDUCATIONAL_TIPS = [
     "🔎 Look for supporting evidence like data, studies, or expert opinions"
 ]
 
+# Example claims offered on the welcome screen
+EXAMPLES = (
+    "NASA discovered water on Mars",
+    "Eating chocolate improves memory",
+    "The Great Wall of China is visible from space",
+    "COVID-19 vaccines contain microchips",
+    "Shark attacks are more common than lightning strikes",
+)
+
+EDUCATIONAL_FOOTER_HTML = '<div class="educational-tip">💡 Remember: Always verify critical information with multiple reliable sources. This tool is an aid, not a replacement for critical thinking.</div>'
+
 # Credible domains for source scoring
 CREDIBLE_DOMAINS = {
     'reuters.com': 0.95, 'ap.org': 0.95, 'bbc.com': 0.9, 'bbc.co.uk': 0.9,
@@ -244,12 +292,132 @@ CREDIBLE_DOMAINS = {
     '.gov': 0.95, '.edu': 0.9, '.ac.uk': 0.9, '.edu.au': 0.9,
     'who.int': 0.95, 'un.org': 0.95, 'nasa.gov': 0.95, 'nih.gov': 0.95
 }
+# Matched against the URL's hostname only, so ".gov" in a path or querystring doesn't count
+_EXACT_DOMAINS = {d: s for d, s in CREDIBLE_DOMAINS.items() if not d.startswith('.')}
+_TLD_SUFFIXES = [(d, s) for d, s in CREDIBLE_DOMAINS.items() if d.startswith('.')]
+# Content quality indicators; re.I avoids lowercasing the whole article
+_TOKEN_RE = re.compile(r"\S+")
+_QUALITY_RE = re.compile(r"\b(?:study|research|data|according to|experts say)\b", re.I)
+
+# Shared HTTP session: keep-alive connections are reused across fetches and worker threads
+HEADERS = {"User-Agent": "Mozilla/5.0 (compatible; FactCheckAI/1.0; +https://github.com/yourusername/factcheck-ai)"}
+
+@st.cache_resource(show_spinner=False)
+def _http_session() -> requests.Session:
+    """Build the pooled session once per process (Streamlit re-executes module code on every rerun)"""
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+SESSION = _http_session()
+
+# Persistent L2 cache under the in-memory st.cache_data layer
+DISK_CACHE_DIR = "./.factcheck_cache"
+DISK_CACHE_TTL = 24 * 3600  # seconds
+RSS_CACHE_TTL = 3600  # news goes stale fast: disk must not outlive the in-memory layer
+
+@st.cache_resource(show_spinner=False)
+def _disk_cache():
+    """Open the on-disk cache once per process; None if diskcache is missing or the directory is unusable"""
+    if diskcache is None:
+        return None
+    try:
+        return diskcache.Cache(DISK_CACHE_DIR)
+    except Exception:
+        return None
+
+DISK_CACHE = _disk_cache()
+
+# Article bodies sit near the top of the page; cap downloads to bound memory per worker
+MAX_HTML_BYTES = 512 * 1024
+
+# Article extraction: boilerplate to strip and content containers to try, compiled once
+BOILERPLATE_XPATH = XPath("//script|//style|//noscript|//header|//footer|//nav|//aside|//comment()")
+
+def _node_text(elem) -> str:
+    """Text of elem with every text node stripped and space-joined, like BS4's get_text(" ", strip=True).
+
+    text_content() glues adjacent elements together ("here.Next", "alphabeta").
+    """
+    return " ".join(piece for piece in (s.strip() for s in elem.itertext()) if piece)
+ARTICLE_SELECTORS = [
+    CSSSelector(sel) for sel in
+    ["article", "main", "[itemprop='articleBody']", ".article-content", ".post-content", ".story-content"]
+]
+
+# Per-source evidence length in the Gemini prompt, and in the results preview
+PROMPT_SNIPPET_CHARS = 1200
+PREVIEW_CHARS = 2000
+
+# Regexes used on every model response / prompt build, compiled once
+_FENCE_RE = re.compile(r"^```(?:json)?\s*|\s*```$", re.S)
+_JSON_OBJ_RE = re.compile(r"(\{[\s\S]*\})")
+_RATIONALE_SPLIT_RE = re.compile(r"\n|-{1,}\s*")
+# Salvage of non-JSON model output: verdict, "NN%" and "confidence: 0.x" in a single scan.
+# The lookahead stops "confidence 10%" being read as confidence 1 followed by "0%".
+_SALVAGE_RE = re.compile(
+    r'(?i)(?P<v>likely true|likely false|uncertain)'
+    r'|(?P<pct>\d?\.\d+|\d+)%'
+    r'|confidence[:\s]*(?P<c>[0-1](?:\.\d+)?)(?![\d.%])'
+)
+_WORD_RE = re.compile(r"\w+")
+_RFC822_RE = re.compile(
+    r"^\s*(?:[A-Za-z]{3},\s*)?\d{1,2}\s+[A-Za-z]{3}\s+\d{4}\s+\d{1,2}:\d{2}(?::\d{2})?\s+(?:[A-Za-z]{1,5}|[+-]\d{4})\s*$"
+)
+_NEGATION_RE = re.compile(
+    "|".join(["no evidence", "not true", "debunk", "false", "denied", "not found", "refute"]), re.I
+)
 
 # -------------
 # Helper Functions
 # -------------
-@st.cache_data(show_spinner=False, ttl=3600, max_entries=100)
-def fetch_google_news(query: str, region: str):
+def _parse_feed(rss_url: str, timeout: int):
+    """Download an RSS feed over the shared session (bounded by timeout) and parse it"""
+    response = SESSION.get(rss_url, headers=HEADERS, timeout=timeout)
+    response.raise_for_status()
+    import feedparser  # deferred: only needed once a feed has actually been downloaded
+    return feedparser.parse(response.content)
+
+def _disk_key(*parts) -> str:
+    """Stable on-disk cache key for a tuple of call arguments"""
+    return hashlib.sha256(repr(parts).encode("utf-8")).hexdigest()
+
+def _disk_get(key: str):
+    """Read from the persistent cache, treating any cache error as a miss"""
+    if DISK_CACHE is None:
+        return None
+    try:
+        return DISK_CACHE.get(key)
+    except Exception:
+        return None
+
+def _disk_set(key: str, value, expire: int = DISK_CACHE_TTL) -> None:
+    """Write-back to the persistent cache; failures are ignored"""
+    if DISK_CACHE is None:
+        return
+    try:
+        DISK_CACHE.set(key, value, expire=expire)
+    except Exception:
+        pass
+
+@st.cache_data(show_spinner=False, ttl=RSS_CACHE_TTL, max_entries=100)
+def fetch_google_news(query: str, region: str, timeout: int = 8):
+    """
+    Fetch Google News RSS results, memoized in RAM (st.cache_data) and on disk, and return (results, used_url)
+    """
+    key = _disk_key("rss", query, region)
+    cached = _disk_get(key)
+    if cached is not None:
+        return cached
+    results, used_url = _fetch_google_news(query, region, timeout)
+    if results:
+        _disk_set(key, (results, used_url), expire=RSS_CACHE_TTL)
+    return results, used_url
+
+def _fetch_google_news(query: str, region: str, timeout: int = 8):
     """
     Fetch Google News RSS results, try a couple of RSS URL variations and return (results, used_url)
     """
@@ -257,83 +425,240 @@ def fetch_google_news(query: str, region: str):
     primary = f"https://news.google.com/rss/search?q={quote_plus(query)}&hl=en-{region}&gl={region}&ceid={region}:en"
     fallback = f"https://news.google.com/rss/search?q={quote_plus(query)}"
 
-    for rss_url in (primary, fallback):
-        feed = feedparser.parse(rss_url)
-        # If parser had entries, return them (even if published missing)
-        if getattr(feed, "entries", None):
-            results = []
-            for entry in feed.entries:
-                results.append({
-                    "title": entry.get("title"),
-                    "link": entry.get("link"),
-                    "published": getattr(entry, "published", None),
-                    "source": getattr(entry, "source", {}).get("title") if hasattr(entry, "source") else None,
-                })
-            return results, rss_url
+    # Fire both requests at once so the fallback path costs max(t_primary, t_fallback), not the sum
+    executor = ThreadPoolExecutor(max_workers=2)
+    try:
+        futures = {executor.submit(_parse_feed, rss_url, timeout): rss_url for rss_url in (primary, fallback)}
+        feeds = {}
+        for fut in as_completed(futures):
+            rss_url = futures[fut]
+            try:
+                feeds[rss_url] = fut.result()
+            except Exception:
+                feeds[rss_url] = None
+            # Region-specific results win; take the fallback only once the primary came back empty
+            for candidate in (primary, fallback):
+                if candidate not in feeds:
+                    break
+                feed = feeds[candidate]
+                # If parser had entries, return them (even if published missing)
+                if getattr(feed, "entries", None):
+                    results = []
+                    for entry in feed.entries:
+                        results.append({
+                            "title": entry.get("title"),
+                            "link": entry.get("link"),
+                            "published": getattr(entry, "published", None),
+                            "source": getattr(entry, "source", {}).get("title") if hasattr(entry, "source") else None,
+                        })
+                    return results, candidate
+    finally:
+        # don't block on the losing request
+        executor.shutdown(wait=False, cancel_futures=True)
 
     # nothing found - return empty with last attempted URL
     return [], fallback
 
-@st.cache_data(show_spinner=False, ttl=1800, max_entries=50)
-def extract_article_text(url: str, timeout: int = 8) -> str:
+ARTICLE_CACHE_TTL = 1800  # seconds
+ARTICLE_CACHE_ENTRIES = 50
+
+@st.cache_resource(show_spinner=False)
+def _extracted_articles() -> dict:
+    """(url, timeout) -> when extract_article_text last ran for it, i.e. roughly what its RAM cache holds"""
+    return {}
+
+@st.cache_data(show_spinner=False, ttl=ARTICLE_CACHE_TTL, max_entries=ARTICLE_CACHE_ENTRIES)
+def extract_article_text(url: str, timeout: int = 8, _prefetched: Optional[tuple[bytes, Optional[str]]] = None) -> str:
+    """Extract article text, memoized in RAM (st.cache_data) and on disk.
+
+    _prefetched is an optional (body, charset) from prefetch_article_html; it is not part of the cache key.
+    """
+    _extracted_articles()[(url, timeout)] = time.time()
+    key = _disk_key("article", url, timeout)
+    cached = _disk_get(key)
+    if cached is not None:
+        return cached
+    text = _extract_article_text(url, timeout, _prefetched)
+    if text:
+        _disk_set(key, text)
+    return text
+
+async def _fetch_html_async(session, url: str, timeout: int) -> tuple[bytes, Optional[str]]:
+    """aiohttp twin of _fetch_html: same byte cap and charset rule"""
+    async with session.get(url, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+        response.raise_for_status()
+        buf = bytearray()
+        async for chunk in response.content.iter_chunked(16384):
+            buf += chunk
+            if len(buf) >= MAX_HTML_BYTES:
+                break
+        content_type = response.headers.get("Content-Type", "").lower()
+        encoding = response.charset if "charset=" in content_type else None
+    return bytes(buf[:MAX_HTML_BYTES]), encoding
+
+async def _gather_html(urls: list[str], timeout: int) -> dict:
+    """Fetch all urls concurrently on one aiohttp session; failed fetches are left out so callers fall back to _fetch_html"""
+    connector = aiohttp.TCPConnector(limit=16, ttl_dns_cache=300)
+    async with aiohttp.ClientSession(connector=connector, headers=HEADERS) as session:
+        results = await asyncio.gather(*[_fetch_html_async(session, u, timeout) for u in urls], return_exceptions=True)
+    return {u: r for u, r in zip(urls, results) if not isinstance(r, BaseException)}
+
+def prefetch_article_html(urls: list[str], timeout: int = 8) -> dict:
+    """Download the HTML of every url not already cached (RAM or disk) in one asyncio fan-out; {} if aiohttp is unavailable"""
+    if aiohttp is None:
+        return {}
+    # st.cache_data can't be probed, so mirror its ttl/max_entries over the extraction log. A URL evicted
+    # early just isn't prefetched and extract_article_text fetches it synchronously instead
+    seen = _extracted_articles()
+    now = time.time()
+    recent = sorted((t, k) for k, t in list(seen.items()) if now - t < ARTICLE_CACHE_TTL)[-ARTICLE_CACHE_ENTRIES:]
+    warm = {k for _, k in recent}
+    for k in [k for k in list(seen) if k not in warm]:
+        seen.pop(k, None)
+    misses = [
+        u for u in dict.fromkeys(urls)
+        if (u, timeout) not in warm and _disk_get(_disk_key("article", u, timeout)) is None
+    ]
+    if not misses:
+        return {}
+    try:
+        return asyncio.run(_gather_html(misses, timeout))
+    except Exception:
+        return {}
+
+def _fetch_html(url: str, timeout: int = 8) -> tuple[bytes, Optional[str]]:
+    """Stream at most MAX_HTML_BYTES of a page; return (body, charset from Content-Type or None)"""
+    with SESSION.get(url, headers=HEADERS, timeout=timeout, stream=True) as response:
+        response.raise_for_status()
+        buf = bytearray()
+        for chunk in response.iter_content(chunk_size=16384):
+            buf += chunk
+            if len(buf) >= MAX_HTML_BYTES:
+                break
+        # requests assumes ISO-8859-1 for text/* without a charset; only trust an explicit one
+        content_type = response.headers.get("Content-Type", "").lower()
+        encoding = response.encoding if "charset=" in content_type else None
+    return bytes(buf[:MAX_HTML_BYTES]), encoding
+
+def _extract_article_text(url: str, timeout: int = 8, prefetched: Optional[tuple[bytes, Optional[str]]] = None) -> str:
     """Extract article text with improved error handling"""
     try:
-        if NEWSPAPER_OK:
+        # download once (unless already prefetched); newspaper and the lxml fallback both reuse it
+        raw, encoding = prefetched if prefetched is not None else _fetch_html(url, timeout)
+        if not raw:
+            return ""
+        html = None
+        if encoding is not None:
+            try:
+                html = raw.decode(encoding, errors="replace")
+            except LookupError:
+                encoding = None  # bogus charset label: let the parsers detect the encoding instead
+        # without a trusted charset newspaper gets bytes and detects it itself (UnicodeDammit)
+        page = raw if encoding is None else html
+
+        tree = None
+        Article = _newspaper_article()
+        if Article is not None:
             try:
                 art = Article(url)
-                art.download()
+                art.download(input_html=page)
                 art.parse()
                 text = art.text.strip()
                 if text and len(text.split()) > 50:
                     return text
+                # newspaper keeps an uncleaned copy of its lxml parse; reuse it instead of parsing again,
+                # but only if it parsed a string decoded with the server's charset. Otherwise lxml's own
+                # <meta charset> handling of the raw bytes below is the more reliable decode
+                if encoding is not None:
+                    tree = getattr(art, "clean_doc", None)
             except Exception:
                 pass
 
-        headers = {"User-Agent": "Mozilla/5.0 (compatible; FactCheckAI/1.0; +https://github.com/yourusername/factcheck-ai)"}
-        response = requests.get(url, headers=headers, timeout=timeout)
-        response.raise_for_status()
-
-        soup = BeautifulSoup(response.text, "html.parser")
-        for tag in soup(["script", "style", "noscript", "header", "footer", "nav", "aside"]):
-            tag.decompose()
+        # raw lxml: no BeautifulSoup wrapper objects around the tree
+        if tree is None:
+            # always bytes: lxml rejects a str that starts with an <?xml ... encoding=...?> declaration.
+            # The server's charset goes to the parser; without one lxml honours the page's <meta charset>
+            parser = None
+            if encoding is not None:
+                try:
+                    parser = lxml.html.HTMLParser(encoding=encoding)
+                except LookupError:
+                    pass  # a codec Python knows but libxml2 doesn't: let lxml detect it
+            tree = lxml.html.fromstring(raw, parser=parser)
+        for bad in BOILERPLATE_XPATH(tree):
+            bad.drop_tree()  # keeps the element's tail text, unlike getparent().remove()
 
-        selectors = ["article", "main", "[itemprop='articleBody']", ".article-content", ".post-content", ".story-content"]
-        for selector in selectors:
-            elements = soup.select(selector)
+        for selector in ARTICLE_SELECTORS:
+            elements = selector(tree)
             if elements:
-                text = " ".join([elem.get_text(" ", strip=True) for elem in elements])
+                text = " ".join(_node_text(elem) for elem in elements)
                 if len(text.split()) > 50:
                     return text
         
         # fallback whole page
-        return soup.get_text(" ", strip=True)
+        return _node_text(tree)
         
     except Exception:
         return ""  # return empty string on failure rather than an error message
 
-def parse_pubdate_safe(date_str):
-    """Try feedparser._parse_date first, fallback to None"""
+def _parse_pub_fields(date_str: str):
+    """Parse a feed date to a UTC (Y, m, d, H, M, S) tuple"""
+    if _RFC822_RE.match(date_str):
+        # RSS pubDate: skip feedparser's multi-format dispatcher
+        try:
+            dt = parsedate_to_datetime(date_str)
+            if dt.tzinfo is not None:
+                dt = dt.astimezone(timezone.utc)
+            return dt.timetuple()[:6]
+        except Exception:
+            pass
     try:
-        parsed = feedparser._parse_date(date_str)
+        # feedparser 6 moved the dispatcher out of the top-level module
+        from feedparser.datetimes import _parse_date
+        parsed = _parse_date(date_str)
         if parsed:
-            return datetime(*parsed[:6])
+            return tuple(parsed[:6])
     except Exception:
         pass
     return None
 
+@st.cache_resource(show_spinner=False)
+def _parse_pub_memo():
+    """Process-wide lru memo over _parse_pub_fields; identical timestamps repeat across feeds and reruns"""
+    return functools.lru_cache(maxsize=4096)(_parse_pub_fields)
+
+def parse_pubdate_safe(date_str):
+    """Parse a feed date (RFC 822 fast path, then feedparser.datetimes._parse_date), fallback to None"""
+    if not date_str:
+        return None
+    parsed = _parse_pub_memo()(date_str)
+    # build a fresh datetime per call; only the parsed fields are cached
+    return datetime(*parsed) if parsed else None
+
 def rate_source_credibility(url: str, content: str) -> float:
     """Rate source credibility score (0-1)"""
     credibility = 0.5
-    url_l = (url or "").lower()
+    try:
+        host = (urlsplit(url or "").hostname or "").lower()
+    except ValueError:
+        host = ""
     
-    for domain_pattern, score in CREDIBLE_DOMAINS.items():
-        if domain_pattern in url_l:
+    # exact domain or any parent of it (www.bbc.co.uk -> bbc.co.uk -> co.uk -> uk)
+    domain = host
+    while domain:
+        if domain in _EXACT_DOMAINS:
+            credibility = max(credibility, _EXACT_DOMAINS[domain])
+        domain = domain.partition(".")[2]
+    for suffix, score in _TLD_SUFFIXES:
+        if host.endswith(suffix):
             credibility = max(credibility, score)
     
     # Content quality indicators
-    if len((content or "").split()) > 200:
+    content = content or ""
+    # count at most 201 tokens instead of splitting the whole article into a list
+    if sum(1 for _ in itertools.islice(_TOKEN_RE.finditer(content), 201)) > 200:
         credibility = min(credibility + 0.1, 1.0)
-    if any(keyword in (content or "").lower() for keyword in ['study', 'research', 'data', 'according to', 'experts say']):
+    if _QUALITY_RE.search(content):
         credibility = min(credibility + 0.05, 1.0)
     
     return credibility
@@ -344,13 +669,14 @@ def trim_text(text: str, max_chars: int = 4000) -> str:
         return ""
     if len(text) <= max_chars:
         return text
+    # keep everything up to the last sentence terminator; str.rfind avoids regex backtracking
     cut = text[:max_chars]
-    m = re.findall(r"^(.+?[.!?])\s", cut, flags=re.S)
-    return m[-1] if m else cut
+    i = max(cut.rfind(". "), cut.rfind("! "), cut.rfind("? "))
+    return cut[:i + 1] if i != -1 else cut
 
 def make_prompt_for_gemini(claim: str, evidence_items: list[str]) -> str:
     """Create an optimized prompt that requests JSON with verdict, confidence, rationale[], cited_sources[]"""
-    bullets = "\n\n".join([f"[Source {i+1}]\n{trim_text(txt, 1200)}" for i, txt in enumerate(evidence_items)])
+    bullets = "\n\n".join([f"[Source {i+1}]\n{trim_text(txt, PROMPT_SNIPPET_CHARS)}" for i, txt in enumerate(evidence_items)])
     return f"""
 You are an expert fact-checker. Use the EVIDENCE below to evaluate the CLAIM.
 
@@ -374,48 +700,50 @@ def extract_json_from_text(text: str):
     if not text:
         return None
     # remove triple backticks if present
-    text = re.sub(r"^```(?:json)?\s*|\s*```$", "", text.strip(), flags=re.S)
+    text = _FENCE_RE.sub("", text.strip())
     # find substring that looks like JSON object
-    m = re.search(r"(\{[\s\S]*\})", text)
+    m = _JSON_OBJ_RE.search(text)
     if m:
         try:
-            return json.loads(m.group(1))
+            return json_loads(m.group(1))
         except Exception:
             # try to fix common issues: replace single quotes with double (risky)
             try:
                 fixed = m.group(1).replace("'", "\"")
-                return json.loads(fixed)
+                return json_loads(fixed)
             except Exception:
                 return None
     # final fallback: try to parse whole text
     try:
-        return json.loads(text)
+        return json_loads(text)
     except Exception:
         return None
 
+def _score_doc(d: dict, kw_re):
+    """Score one doc for the fallback analysis: (support_flag, contradict_flag, credibility, cited excerpt)"""
+    # search title and body separately rather than concatenating a copy of the whole article
+    fields = [d.get("title") or "", d.get("text") or ""]
+    # any keyword present counts as support
+    supports = bool(kw_re) and any(kw_re.search(f) for f in fields)
+    # naive contradiction detection
+    contradicts = any(_NEGATION_RE.search(f) for f in fields)
+    # pick short summary
+    excerpt = (d.get("text") or d.get("title") or "")[:280]
+    return supports, contradicts, d.get("credibility", 0.5), {"idx": d["idx"], "quote_or_summary": excerpt, "relevance": "med"}
+
 def fallback_rule_based_analysis(claim: str, docs: list[dict]):
     """A simple deterministic fallback analysis when Gemini is unavailable or parsing fails."""
-    keywords = [w.lower() for w in re.findall(r"\w+", claim) if len(w) > 3]
+    keywords = [w.lower() for w in _WORD_RE.findall(claim) if len(w) > 3]
     if not keywords:
         keywords = [w.lower() for w in claim.split() if len(w) > 3]
+    # one alternation regex per claim: a single C-level scan per doc instead of one per keyword
+    kw_re = re.compile("|".join(re.escape(k) for k in sorted(set(keywords))), re.I) if keywords else None
     total = len(docs)
-    support = 0
-    contradict = 0
-    top_sources = []
-    scores = []
-    for d in docs:
-        txt = (d.get("title", "") + " " + d.get("text", "")).lower()
-        # count how many keywords appear
-        kcount = sum(1 for k in keywords if k in txt)
-        if kcount > 0:
-            support += 1
-        # naive contradiction detection
-        if any(phrase in txt for phrase in ["no evidence", "not true", "debunk", "false", "denied", "not found", "refute"]):
-            contradict += 1
-        scores.append(d.get("credibility", 0.5))
-        # pick short summary
-        excerpt = (d.get("text") or d.get("title") or "")[:280]
-        top_sources.append({"idx": d["idx"], "quote_or_summary": excerpt, "relevance": "med"})
+    scored = [_score_doc(d, kw_re) for d in docs]
+    support = sum(s[0] for s in scored)
+    contradict = sum(s[1] for s in scored)
+    scores = [s[2] for s in scored]
+    top_sources = [s[3] for s in scored]
     avg_cred = sum(scores) / max(1, len(scores))
     # Decide
     if support >= max(1, math.ceil(total * 0.6)) and avg_cred > 0.6:
@@ -445,16 +773,41 @@ def fallback_rule_based_analysis(claim: str, docs: list[dict]):
     cited = top_sources[:3]
     return {"verdict": verdict, "confidence": confidence, "rationale": rationale, "cited_sources": cited}
 
-@st.cache_data(show_spinner=False, ttl=600, max_entries=20)
+@st.cache_resource(show_spinner=False)
+def _gemini_model():
+    """Shared Gemini model handle; the client is stateless per request so one per process is safe"""
+    return genai.GenerativeModel(GEMINI_MODE)
+
 def reason_with_gemini(claim: str, docs: list[dict], temperature: float = 0.3):
-    """Enhanced Gemini reasoning with robust parsing and deterministic fallback."""
+    """Gemini verdict for claim+docs, cached on the claim and the ordered list of source URLs."""
+    # hashing a short key is far cheaper than hashing every doc's full text. The URLs stay in idx order:
+    # cited_sources[].idx refers to positions, so a reordered source list must not reuse the cached result
+    key = hashlib.sha1((claim + "|" + "|".join(d.get("url") or "" for d in docs)).encode("utf-8")).hexdigest()
+    result = _reason_with_gemini(key, temperature, claim, docs)
+    result["verdict_class"] = classify_verdict(result.get("verdict", "Uncertain"))
+    return result
+
+def classify_verdict(verdict: str) -> str:
+    """Map a free-text verdict to "true" / "false" / "uncertain" (checks false first: "not true" is false)"""
+    v = (verdict or "").lower()
+    if "false" in v or "not true" in v:
+        return "false"
+    if "true" in v:
+        return "true"
+    return "uncertain"
+
+@st.cache_data(show_spinner=False, ttl=600, max_entries=20)
+def _reason_with_gemini(key: str, temperature: float, _claim: str, _docs: list[dict]):
+    """Enhanced Gemini reasoning with robust parsing and deterministic fallback (underscored args are not hashed)."""
+    claim, docs = _claim, _docs
     # If genai not configured, use fallback rule-based analysis
     if not genai:
         return fallback_rule_based_analysis(claim, docs)
     try:
-        texts = [d.get("text", "") or d.get("title", "") for d in docs]
+        # prompt snippets are trimmed once when docs are built
+        texts = [d.get("snippet") or d.get("text", "") or d.get("title", "") for d in docs]
         prompt = make_prompt_for_gemini(claim, texts)
-        model = genai.GenerativeModel(GEMINI_MODE)
+        model = _gemini_model()
         resp = model.generate_content(prompt, generation_config={"temperature": temperature})
         output = resp.text.strip()
         # Try to extract JSON
@@ -466,7 +819,7 @@ def reason_with_gemini(claim: str, docs: list[dict], temperature: float = 0.3):
             # ensure rationale is list
             rat = parsed.get("rationale", parsed.get("reasoning", []))
             if isinstance(rat, str):
-                rat = [r.strip() for r in re.split(r"\n|-{1,}\s*", rat) if r.strip()]
+                rat = [r.strip() for r in _RATIONALE_SPLIT_RE.split(rat) if r.strip()]
             parsed["rationale"] = rat
             parsed.setdefault("cited_sources", parsed.get("cited_sources", []))
             return {
@@ -477,16 +830,19 @@ def reason_with_gemini(claim: str, docs: list[dict], temperature: float = 0.3):
             }
         else:
             # if we couldn't parse JSON, try to salvage with regex extraction for verdict & confidence
-            v_match = re.search(r'(?i)(likely true|likely false|uncertain)', output)
-            verdict = v_match.group(0).title() if v_match else "Uncertain"
-            c_match = re.search(r'(\d?\.\d+|\d+)%', output)
-            if c_match:
+            # one pass over the output, keeping the first hit of each kind
+            found = {}
+            for m in _SALVAGE_RE.finditer(output):
+                found.setdefault(m.lastgroup, m.group(m.lastgroup))
+                if "v" in found and "pct" in found:
+                    break
+            verdict = found["v"].title() if "v" in found else "Uncertain"
+            if "pct" in found:
                 # if % present
-                conf = float(c_match.group(1).replace("%", "")) / 100.0
+                conf = float(found["pct"]) / 100.0
             else:
                 # fallback numeric
-                num_match = re.search(r'confidence[:\s]*([0-1](?:\.\d+)?)', output, re.I)
-                conf = float(num_match.group(1)) if num_match else 0.5
+                conf = float(found["c"]) if "c" in found else 0.5
             # Take first 3 lines as rationale
             lines = [ln.strip() for ln in output.splitlines() if ln.strip()]
             rationale = lines[:3] if lines else ["Model returned text but not parseable JSON."]
@@ -499,9 +855,86 @@ def reason_with_gemini(claim: str, docs: list[dict], temperature: float = 0.3):
         # Final fallback to deterministic rule-based analysis
         return fallback_rule_based_analysis(claim, docs)
 
-def create_shareable_report(claim: str, result: dict, sources: list) -> str:
-    """Create shareable report text"""
+# Verdict banner per verdict_class (see classify_verdict)
+_VERDICT_HTML = {
+    "true": '<div class="verdict-true">✅ Verdict: {v}</div>',
+    "false": '<div class="verdict-false">❌ Verdict: {v}</div>',
+    "uncertain": '<div class="verdict-uncertain">⚠️ Verdict: {v}</div>',
+}
+# (threshold, emoji, label): first tier whose threshold the score exceeds
+_CRED_TIERS = ((0.7, "👍", "High"), (0.5, "⚠️", "Medium"), (-1.0, "❗", "Low"))
+# confidence > 0.7, > 0.4, otherwise
+_CONFIDENCE_COLORS = ('#2e8b57', '#ff8c00', '#dc143c')
+
+@st.cache_data(show_spinner=False)
+def render_results_html(verdict_class: str, verdict: str, confidence: float) -> str:
+    """Verdict banner, confidence figure and confidence bar as a single HTML string"""
+    verdict_html = _VERDICT_HTML.get(verdict_class, _VERDICT_HTML["uncertain"]).format(v=escape(verdict))
+    color = _CONFIDENCE_COLORS[(confidence <= 0.7) + (confidence <= 0.4)]
     return f"""
+{verdict_html}
+<div><strong>Confidence: {confidence:.0%}</strong></div>
+<div class="confidence-bar">
+    <div class="confidence-fill" style="width: {confidence*100}%; background: {color};"></div>
+</div>
+"""
+
+def source_badge_html(credibility: float) -> str:
+    """Credibility badge span for one source; only called from sources_table_html, whose st.cache_data covers reruns"""
+    emoji, label = next((e, l) for t, e, l in _CRED_TIERS if credibility > t)
+    return f'<span class="source-badge">{emoji} {label} Credibility ({credibility:.0%})</span>'
+
+@st.cache_data(show_spinner=False)
+def sources_table_html(sources_key: tuple) -> str:
+    """'Sources Analyzed' list as one HTML table; sources_key rows come from docs_key()"""
+    rows = []
+    for idx, url, title, source, published, credibility in sources_key:
+        meta = " • ".join(escape(str(m)) for m in (source, published) if m)
+        rows.append(
+            f'<tr><td><strong>{idx}. <a href="{escape(url or "", quote=True)}" target="_blank">{escape(title or url or "")}</a></strong>'
+            f'<br><small>{meta}</small><br>{source_badge_html(credibility)}</td></tr>'
+        )
+    return f'<table style="width: 100%;">{"".join(rows)}</table>'
+
+def docs_key(docs: list[dict]) -> tuple:
+    """Small hashable summary of the analysed docs for st.cache_data keys (no article text)"""
+    return tuple(
+        (d["idx"], d.get("url"), d.get("title"), d.get("source"), d.get("published"), d.get("credibility"))
+        for d in docs
+    )
+
+@st.cache_resource(show_spinner=False)
+def _share_urls_memo():
+    """Process-wide lru memo behind share_urls; a module-level lru_cache is rebuilt on every rerun"""
+    @functools.lru_cache(maxsize=256)
+    def build(share_text: str) -> tuple[str, str]:
+        encoded = quote_plus(share_text)
+        return f"https://twitter.com/intent/tweet?text={encoded}", f"https://wa.me/?text={encoded}"
+    return build
+
+def share_urls(share_text: str) -> tuple[str, str]:
+    """(Twitter, WhatsApp) share links; share_text is deterministic from claim + verdict, so reruns hit the memo"""
+    return _share_urls_memo()(share_text)
+
+def create_shareable_report(claim: str, result_json: str, sources_key: tuple) -> str:
+    """Create shareable report text; only the analysis date is formatted per call"""
+    return f"""{_report_body(claim, result_json, sources_key)}
+Analysis Date: {datetime.now().strftime('%Y-%m-%d %H:%M')}
+
+───
+Generated by FactCheckAI - Transparent fact-checking with evidence
+""".strip()
+
+@st.cache_data(show_spinner=False, ttl=3600, max_entries=50)
+def _report_body(claim: str, result_json: str, sources_key: tuple) -> str:
+    """Date-free part of the report, cached in RAM and in the TTL-bounded disk cache across sessions"""
+    key = _disk_key("report", claim, result_json, sources_key)
+    cached = _disk_get(key)
+    if cached is not None:
+        return cached
+    result = json.loads(result_json)
+    sources = sources_key
+    body = f"""
 🔍 FactCheckAI Analysis Report
 ──────────────────────────────
 
@@ -514,11 +947,45 @@ Key Findings:
 {chr(10).join(f'• {point}' for point in result.get('rationale', [])[:3])}
 
 Sources Analyzed: {len(sources)}
-Analysis Date: {datetime.now().strftime('%Y-%m-%d %H:%M')}
-
-───
-Generated by FactCheckAI - Transparent fact-checking with evidence
 """.strip()
+    _disk_set(key, body)
+    return body
+
+def _open_preview(idx: int):
+    st.session_state[f"prev_open_{idx}"] = True
+
+@st.fragment
+def _preview(idx: int, text: str):
+    """Source excerpt, only sent to the browser once the reader asks for it; the click reruns just this fragment"""
+    if not st.session_state.get(f"prev_open_{idx}", False):
+        st.button("Show excerpt", key=f"prev_btn_{idx}", on_click=_open_preview, args=(idx,))
+        return
+    st.text(text if text else "No extractable text; click source link to open article.")
+
+@st.fragment
+def _share_fragment(report: str, report_bytes: bytes, file_name: str, twitter_url: str, wa_url: str):
+    """Share / export controls; everything is precomputed so a fragment rerun builds no strings"""
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        # the toggle owns its state, so showing/hiding the report needs no st.rerun()
+        show = st.toggle("📋 Full Report", key="show_report")
+    
+    # Show report if requested
+    if show:
+        st.code(report)
+            
+    with col2:
+        st.download_button(
+            "📥 Download",
+            data=report_bytes,
+            file_name=file_name,
+            mime="text/plain",
+            use_container_width=True
+        )
+    with col3:
+        st.markdown(f"[🐦 Tweet result]({twitter_url})", unsafe_allow_html=True)
+    with col4:
+        st.markdown(f"[💬 Share on WhatsApp]({wa_url})", unsafe_allow_html=True)
 
 # -------------
 # Subscription Plans
@@ -749,16 +1216,22 @@ def main():
         status_text.text(stages[1])
         
         docs = []
-        with ThreadPoolExecutor(max_workers=3) as executor:
-            futures = {executor.submit(extract_article_text, item["link"]): item for item in filtered}
-            idx = 0
+        # Download every uncached page in one asyncio fan-out; the pool below then mostly parses.
+        # Without aiohttp, prefetched is empty and the workers fetch over the shared session instead.
+        prefetched = prefetch_article_html([item["link"] for item in filtered])
+        # one worker per article (capped) so wall-clock is ~ the slowest fetch
+        with ThreadPoolExecutor(max_workers=min(len(filtered), 12)) as executor:
+            # number sources by feed position, not completion order, so cached verdicts' cited idx stay valid
+            futures = {
+                executor.submit(extract_article_text, item["link"], 8, prefetched.get(item["link"])): (idx, item)
+                for idx, item in enumerate(filtered, 1)
+            }
             for fut in as_completed(futures):
-                item = futures[fut]
+                idx, item = futures[fut]
                 try:
                     text = fut.result(timeout=12)
                 except Exception:
                     text = ""
-                idx += 1
                 credibility = rate_source_credibility(item.get("link", ""), text)
                 docs.append({
                     "idx": idx,
@@ -767,9 +1240,16 @@ def main():
                     "published": item.get("published"),
                     "source": item.get("source"),
                     "text": text,
+                    "snippet": trim_text(text, PROMPT_SNIPPET_CHARS),
+                    "preview": text[:PREVIEW_CHARS],
                     "credibility": credibility
                 })
         
+        docs.sort(key=lambda d: d["idx"])  # prompt "Source N" labels follow list order
+        # a new analysis starts with every preview collapsed
+        for k in [k for k in st.session_state if str(k).startswith("prev_open_")]:
+            del st.session_state[k]
+        
         if not docs:
             st.error("❌ Could not extract content from articles. Please try a different claim.")
             st.stop()
@@ -778,6 +1258,9 @@ def main():
         progress_bar.progress(75)
         status_text.text(stages[2])
         result = reason_with_gemini(claim, docs, temperature)
+        # full article bodies are only needed for the analysis; rendering uses the preview
+        for d in docs:
+            d.pop("text", None)
         
         # Stage 4: Complete
         progress_bar.progress(100)
@@ -797,28 +1280,12 @@ def main():
         # Display results
         st.markdown("---")
         
-        # Verdict display
-        verdict = result.get("verdict", "Uncertain").lower()
+        # Verdict + confidence visualization: one pre-rendered HTML blob
         confidence = result.get("confidence", 0.5)
-        
-        if "true" in verdict:
-            st.markdown(f'<div class="verdict-true">✅ Verdict: {result["verdict"]}</div>', unsafe_allow_html=True)
-        elif "false" in verdict:
-            st.markdown(f'<div class="verdict-false">❌ Verdict: {result["verdict"]}</div>', unsafe_allow_html=True)
-        else:
-            st.markdown(f'<div class="verdict-uncertain">⚠️ Verdict: {result["verdict"]}</div>', unsafe_allow_html=True)
-        
-        # Confidence visualization
-        col1, col2 = st.columns([1, 3])
-        with col1:
-            st.metric("Confidence", f"{confidence:.0%}")
-        with col2:
-            color = '#2e8b57' if confidence > 0.7 else '#ff8c00' if confidence > 0.4 else '#dc143c'
-            st.markdown(f"""
-            <div class="confidence-bar">
-                <div class="confidence-fill" style="width: {confidence*100}%; background: {color};"></div>
-            </div>
-            """, unsafe_allow_html=True)
+        st.markdown(
+            render_results_html(result["verdict_class"], result.get("verdict", "Uncertain"), confidence),
+            unsafe_allow_html=True,
+        )
         
         # Rationale (model returns 'rationale' array)
         st.subheader("📋 Analysis / Rationale")
@@ -829,80 +1296,42 @@ def main():
         cited = result.get("cited_sources", [])
         if cited:
             st.subheader("🔎 Model-cited snippets")
+            docs_by_idx = {d["idx"]: d for d in docs}
             for c in cited:
                 idx = c.get("idx")
                 quote = c.get("quote_or_summary", "")
-                ref = next((d for d in docs if d["idx"] == idx), None)
+                ref = docs_by_idx.get(idx)
                 if ref:
                     st.markdown(f"> {quote}\n\n— Source {idx}: [{ref['title']}]({ref['url']})")
         
         # Sources section
         st.markdown("---")
         st.subheader("📰 Sources Analyzed")
+        # one HTML table for all sources; only the preview expanders remain per-doc widgets
+        st.markdown(sources_table_html(docs_key(docs)), unsafe_allow_html=True)
         for doc in docs:
-            with st.container():
-                col1, col2 = st.columns([4, 1])
-                with col1:
-                    st.markdown(f"**[{doc['title']}]({doc['url']})**")
-                    meta = []
-                    if doc.get("source"): meta.append(doc["source"])
-                    if doc.get("published"): meta.append(doc["published"])
-                    if meta: st.caption(" • ".join(meta))
-                    
-                    # Credibility badge
-                    if doc["credibility"] > 0.7:
-                        st.markdown(f'<span class="source-badge">👍 High Credibility ({doc["credibility"]:.0%})</span>', unsafe_allow_html=True)
-                    elif doc["credibility"] > 0.5:
-                        st.markdown(f'<span class="source-badge">⚠️ Medium Credibility ({doc["credibility"]:.0%})</span>', unsafe_allow_html=True)
-                    else:
-                        st.markdown(f'<span class="source-badge">❗ Low Credibility ({doc["credibility"]:.0%})</span>', unsafe_allow_html=True)
-                    
-                    # Preview expander (text truncated)
-                    with st.expander("📖 Preview / Excerpt"):
-                        preview_text = (doc.get("text") or "")[:2000]
-                        st.text(preview_text if preview_text else "No extractable text; click source link to open article.")
-                
-                with col2:
-                    st.write("")
+            # Preview expander (text truncated)
+            with st.expander(f"📖 Preview / Excerpt — Source {doc['idx']}"):
+                _preview(doc["idx"], doc.get("preview", ""))
         
         # Share and export section
         st.markdown("---")
         st.subheader("📤 Share Results")
         
-        report = create_shareable_report(claim, result, docs)
+        result_json = json.dumps(result, sort_keys=True, default=str)
+        sources_key = docs_key(docs)
+        report = create_shareable_report(claim, result_json, sources_key)
+        # the download is exactly the report shown on screen
+        report_bytes = report.encode("utf-8")
+        # named by the date-free content, so identical analyses get the same file name
+        file_name = f"factcheck-{hashlib.sha1(_report_body(claim, result_json, sources_key).encode('utf-8')).hexdigest()[:10]}.txt"
         share_text = f"FactCheckAI analysis: '{claim[:60]}...' - Verdict: {result['verdict']}"
-        
-        col1, col2, col3, col4 = st.columns(4)
-        with col1:
-            if st.button("📋 Show Report", use_container_width=True):
-                st.session_state.show_report = True
-        
-        # Show report if requested
-        if st.session_state.get('show_report', False):
-            with st.expander("📋 Full Report", expanded=True):
-                st.code(report)
-            if st.button("Close Report"):
-                st.session_state.show_report = False
-                st.rerun()
-                
-        with col2:
-            st.download_button(
-                "📥 Download",
-                data=report,
-                file_name=f"factcheck-{datetime.now().date()}.txt",
-                mime="text/plain",
-                use_container_width=True
-            )
-        with col3:
-            twitter_url = f"https://twitter.com/intent/tweet?text={quote_plus(share_text)}"
-            st.markdown(f"[🐦 Tweet result]({twitter_url})", unsafe_allow_html=True)
-        with col4:
-            wa_url = f"https://wa.me/?text={quote_plus(share_text)}"
-            st.markdown(f"[💬 Share on WhatsApp]({wa_url})", unsafe_allow_html=True)
+        twitter_url, wa_url = share_urls(share_text)
+        _share_fragment(report, report_bytes, file_name, twitter_url, wa_url)
         
         # Educational footer
         st.markdown("---")
-        st.markdown('<div class="educational-tip">💡 Remember: Always verify critical information with multiple reliable sources. This tool is an aid, not a replacement for critical thinking.</div>', unsafe_allow_html=True)
+        st.markdown(EDUCATIONAL_FOOTER_HTML, unsafe_allow_html=True)
 
     elif not submitted:
         # Welcome state
@@ -910,16 +1339,8 @@ def main():
         
         # Example claims
         st.markdown("### 💡 Example Claims to Try:")
-        examples = [
-            "NASA discovered water on Mars",
-            "Eating chocolate improves memory",
-            "The Great Wall of China is visible from space",
-            "COVID-19 vaccines contain microchips",
-            "Shark attacks are more common than lightning strikes"
-        ]
-        
-        for example in examples:
-            if st.button(f"🔍 {example}", use_container_width=True):
+        for i, example in enumerate(EXAMPLES):
+            if st.button(f"🔍 {example}", use_container_width=True, key=f"ex_{i}"):
                 st.session_state.pre_filled = example
                 st.rerun()
 